@@ -205,7 +205,7 @@ def cozmo_program(robot: cozmo.robot.Robot):
             cozmo_robot_api.restore_backpack_lights()
             try:
                 _, image = cozmo_robot_api.execute_commands(commands)
-                if image:
+                if image is not None:
                     print("Cozmo is thinking about the image...")
                     cozmo_robot_api.set_backpack_lights(cozmo.lights.white_light)
                     image = image.annotate_image()
@@ -2,31 +2,128 @@ import cozmo
 from cozmo.util import degrees, distance_mm, speed_mmps
 from cozmo.song import NoteTypes, SongNote, NoteDurations
 import asyncio
+import functools
+import inspect
+import sys
 import time
 import traceback
+import types
 
 from cozmo_api_base import CozmoAPIBase
 from event_messages import event_log
-import user_voice_input
 
 
 _DEFAULT_TIMEOUT = 15 # seconds
 
+# Animations offered to the model, grouped by the emotion they express
+_ANIMATION_GROUPS = (
+    ("Happy/Excited", (
+        "anim_greeting_happy_03", "anim_pyramid_reacttocube_happy_high_02", "anim_energy_successgetout_02",
+        "anim_explorer_driving01_turbo_01", "anim_memorymatch_solo_successgame_player_01", "anim_fistbump_success_02",
+        "anim_majorwin", "anim_keepaway_wingame_03", "anim_meetcozmo_celebration", "anim_pounce_success_04",
+        "anim_speedtap_wingame_intensity03_01",
+    )),
+    ("Sad/Frustrated", (
+        "anim_pyramid_reacttocube_frustrated_low_01", "anim_memorymatch_solo_failhand_player_01",
+        "anim_reacttocliff_turtlerollfail_03", "anim_driving_upset_loop_01", "anim_speedtap_losehand_02",
+        "anim_memorymatch_failgame_cozmo_03", "anim_reacttoblock_frustrated_int2_01", "anim_rollblock_fail_01",
+        "anim_reacttocliff_stuckrightside_01", "anim_majorfail", "anim_speedtap_losegame_intensity02_02",
+    )),
+    ("Angry/Scared", (
+        "anim_guarddog_getout_timeout_01", "anim_cozmosays_badword_01", "anim_repair_severe_idle_03",
+        "anim_reacttoblock_triestoreach_01", "anim_repair_react_fall_01", "anim_sparking_fail_01",
+        "anim_reacttoface_unidentified_01", "anim_pounce_fail_04", "anim_repair_severe_driving_loop_01",
+    )),
+    ("Calm/Neutral", (
+        "anim_explorer_idle_03", "anim_lookinplaceforfaces_keepalive_long", "anim_sparking_idle_03",
+        "anim_hiking_driving_loop_01", "anim_launch_idle_03", "anim_play_idle_03", "anim_memorymatch_idle_02",
+        "anim_explorer_drvback_start_02", "anim_pause_idle_03", "anim_rtpkeepaway_idle_01", "anim_energy_idlel2_01",
+        "anim_speedtap_player_idle_01", "anim_gamesetup_idle_02", "anim_neutral_eyes_01",
+    )),
+    ("Playful/Curious", (
+        "anim_pounce_drive_01", "anim_fistbump_idle_03", "anim_keepaway_getready_02", "anim_petdetection_cat_01",
+        "anim_explorer_getout_01", "anim_peekaboo_idle_01", "anim_speedtap_ask2play_01",
+        "anim_rtpkeepaway_askforgame_01", "anim_pounce_lookloop_02", "anim_energy_eat_04", "anim_play_driving_start_01",
+        "anim_petdetection_dog_02", "anim_pounce_long_01", "anim_speedtap_look4block_01", "anim_hiking_lookaround_01",
+        "anim_pounce_04", "anim_explorer_huh_01", "anim_pounce_reacttoobj_01_shorter",
+    )),
+    ("Sleepy/Tired", (
+        "anim_launch_startsleeping_01", "anim_guarddog_sleeploop_01", "anim_gotosleep_sleeping_01",
+        "anim_gotosleep_off_01", "anim_gotosleep_sleeploop_01",
+    )),
+    ("Confused/Surprised", (
+        "anim_reacttocliff_huh_01", "anim_dizzy_reaction_medium_03", "anim_hiccup_withreaction_01",
+        "anim_reacttppl_surprise", "anim_explorer_huh_01_head_angle_-10", "anim_dizzy_reaction_soft_02",
+        "anim_hiccup_faceplant_01", "anim_keepalive_eyes_01_updown",
+    )),
+)
+
+# Names accepted by cozmo_plays_animation, in CozmoAPI and in the stub
+ANIMATION_NAMES = frozenset(sys.intern(name) for _, names in _ANIMATION_GROUPS for name in names)
+
+
+def _plays_animation_doc() -> str:
+    """Builds the cozmo_plays_animation docstring, which lists the animations in _ANIMATION_GROUPS for the model."""
+    animations = "\n                \n".join(f"                {emotion}: {', '.join(names)}" for emotion, names in _ANIMATION_GROUPS)
+    return f"""
+        Makes Cozmo play a specific animation.
+
+        Args:
+            animation_name: The name of the animation to play. Supported animation names:
+{animations}
+
+        Returns:
+            A string indicating the result, e.g., "Cozmo played animation: [animation_name]"
+        """
+
+# Accepted values for cozmo_sets_headlight, in CozmoAPI and in the stub
+HEADLIGHT_OPTIONS = types.MappingProxyType({"on": True, "off": False, "true": True, "false": False, "1": True, "0": False})
+
+
+# Notes accepted by cozmo_plays_song, by name, in the order cozmo.song.NoteTypes defines them
+_NOTE_TYPES = types.MappingProxyType({name: note for name, note in vars(NoteTypes).items() if not name.startswith('_')})
 
+
+def parse_song_notes(song_notes: str) -> list:
+    """
+    Splits the notes of a cozmo_plays_song call and returns their NoteTypes.
+    Raises ValueError, with the message for the model, when a note is not supported.
+    """
+    song_notes = song_notes.replace('"', '').replace("'", '')
+    if ',' not in song_notes:
+        song_notes = song_notes.replace(' ', ',')
+
+    note_types = []
+    for note in song_notes.split(','):
+        note = note.strip()
+        note_type = _NOTE_TYPES.get(note)
+        if note_type is None:
+            raise ValueError(f"Failed: Note '{note}' is not supported! Use only: {', '.join(_NOTE_TYPES)}.")
+        note_types.append(note_type)
+    return note_types
+
+
+@functools.lru_cache(maxsize=32)
+def _backpack_light(rgb: tuple) -> cozmo.lights.Light:
+    """Returns a Light for the given (R, G, B) color, reusing the one built for previous calls."""
+    return cozmo.lights.Light(cozmo.lights.Color(rgb=rgb))
+
+
+@functools.lru_cache(maxsize=1)
 def get_api_description() -> str:
     """
     Returns a description of all available cozmo_* API functions in this class, including parameters and return values.
+    The description never changes while the program runs, so it is built only once.
     """
-    description = "CozmoAPI Functions:\n\n"
+    description = ["CozmoAPI Functions:\n\n"]
 
-    for name, method in CozmoAPI.__dict__.items():
-        if callable(method) and name.startswith('cozmo_'):
-            docstring = method.__doc__
-            args_names = ', '.join([arg for arg in method.__code__.co_varnames[:method.__code__.co_argcount] if arg!='self'])
-            if docstring:
-                description += f"{name}({args_names}):\n{docstring}\n\n"
+    for name, method in CozmoAPI.api_commands().items():
+        docstring = method.__doc__
+        args_names = ', '.join([arg for arg in inspect.signature(method).parameters if arg!='self'])
+        if docstring:
+            description.append(f"{name}({args_names}):\n{docstring}\n\n")
 
-    return description
+    return "".join(description)
 
 
 class CozmoAPI(CozmoAPIBase):
@@ -34,6 +131,8 @@ class CozmoAPI(CozmoAPIBase):
     A simplified text-based API interface for controlling Cozmo robot.
     """
 
+    __slots__ = ()
+
     def cozmo_listens(self):
         """
         Listens to the user for 10 seconds.
@@ -58,7 +157,7 @@ class CozmoAPI(CozmoAPIBase):
         action = self.robot.say_text(text)
         action.wait_for_completed(timeout=2*_DEFAULT_TIMEOUT)
         if action.has_succeeded:
-            return f""
+            return ""
         else:
             return f"Failed: {action.failure_reason}"
 
@@ -154,37 +253,19 @@ class CozmoAPI(CozmoAPIBase):
             return f"Failed: {action.failure_reason}"
 
     def cozmo_plays_animation(self, animation_name: str) -> str:
-        """
-        Makes Cozmo play a specific animation.
+        # the docstring, listing _ANIMATION_GROUPS, is set right after this method
+        animation_name = sys.intern(animation_name)
+        if animation_name not in ANIMATION_NAMES:
+            return f"Animation '{animation_name}' not found."
 
-        Args:
-            animation_name: The name of the animation to play. Supported animation names:
-                Happy/Excited: anim_greeting_happy_03, anim_pyramid_reacttocube_happy_high_02, anim_energy_successgetout_02, anim_explorer_driving01_turbo_01, anim_memorymatch_solo_successgame_player_01, anim_fistbump_success_02, anim_majorwin, anim_keepaway_wingame_03, anim_meetcozmo_celebration, anim_pounce_success_04, anim_speedtap_wingame_intensity03_01
-                
-                Sad/Frustrated: anim_pyramid_reacttocube_frustrated_low_01, anim_memorymatch_solo_failhand_player_01, anim_reacttocliff_turtlerollfail_03, anim_driving_upset_loop_01, anim_speedtap_losehand_02, anim_memorymatch_failgame_cozmo_03, anim_reacttoblock_frustrated_int2_01, anim_rollblock_fail_01, anim_reacttocliff_stuckrightside_01, anim_majorfail, anim_speedtap_losegame_intensity02_02
-                
-                Angry/Scared: anim_guarddog_getout_timeout_01, anim_cozmosays_badword_01, anim_repair_severe_idle_03, anim_reacttoblock_triestoreach_01, anim_repair_react_fall_01, anim_sparking_fail_01, anim_reacttoface_unidentified_01, anim_pounce_fail_04, anim_repair_severe_driving_loop_01
-                
-                Calm/Neutral: anim_explorer_idle_03, anim_lookinplaceforfaces_keepalive_long, anim_sparking_idle_03, anim_hiking_driving_loop_01, anim_launch_idle_03, anim_play_idle_03, anim_memorymatch_idle_02, anim_explorer_drvback_start_02, anim_pause_idle_03, anim_rtpkeepaway_idle_01, anim_energy_idlel2_01, anim_speedtap_player_idle_01, anim_gamesetup_idle_02, anim_neutral_eyes_01
-                
-                Playful/Curious: anim_pounce_drive_01, anim_fistbump_idle_03, anim_keepaway_getready_02, anim_petdetection_cat_01, anim_explorer_getout_01, anim_peekaboo_idle_01, anim_speedtap_ask2play_01, anim_rtpkeepaway_askforgame_01, anim_pounce_lookloop_02, anim_energy_eat_04, anim_play_driving_start_01, anim_petdetection_dog_02, anim_pounce_long_01, anim_speedtap_look4block_01, anim_hiking_lookaround_01, anim_pounce_04, anim_explorer_huh_01, anim_pounce_reacttoobj_01_shorter
-                
-                Sleepy/Tired: anim_launch_startsleeping_01, anim_guarddog_sleeploop_01, anim_gotosleep_sleeping_01, anim_gotosleep_off_01, anim_gotosleep_sleeploop_01
-                
-                Confused/Surprised: anim_reacttocliff_huh_01, anim_dizzy_reaction_medium_03, anim_hiccup_withreaction_01, anim_reacttppl_surprise, anim_explorer_huh_01_head_angle_-10, anim_dizzy_reaction_soft_02, anim_hiccup_faceplant_01, anim_keepalive_eyes_01_updown
+        action = self.robot.play_anim(name=animation_name)
+        action.wait_for_completed(timeout=_DEFAULT_TIMEOUT)
+        if action.has_succeeded:
+            return f"Cozmo played animation: {animation_name}"
+        else:
+            return f"Failed: {action.failure_reason}"
 
-        Returns:
-            A string indicating the result, e.g., "Cozmo played animation: [animation_name]"
-        """
-        try:
-            action = self.robot.play_anim(name=animation_name)
-            action.wait_for_completed(timeout=_DEFAULT_TIMEOUT)
-            if action.has_succeeded:
-                return f"Cozmo played animation: {animation_name}"
-            else:
-                return f"Failed: {action.failure_reason}"
-        except KeyError:
-            return f"Animation '{animation_name}' not found."
+    cozmo_plays_animation.__doc__ = _plays_animation_doc()
 
     def cozmo_plays_song(self, song_notes: str) -> str:
         """
@@ -199,20 +280,13 @@ class CozmoAPI(CozmoAPIBase):
         Returns:
             A string indicating the result, e.g., "Cozmo played the song."
         """
-        song_notes = song_notes.replace('"', '').replace("'", '')
-        if ',' not in song_notes:
-            song_notes = song_notes.replace(' ', ',')
-
         try:
-            notes = []
-            for note in song_notes.split(','):
-                try:
-                    note = note.strip()
-                    song_note = SongNote(getattr(NoteTypes, note), NoteDurations.Quarter)
-                    notes.append(song_note)
-                except:
-                    return f"Failed: Note '{note}' is not supported! Use only: C2, C2_Sharp, D2, D2_Sharp, E2, F2, F2_Sharp, G2, G2_Sharp, A2, A2_Sharp, B2, C3, C3_Sharp, Rest."
+            note_types = parse_song_notes(song_notes)
+        except ValueError as e:
+            return str(e)
 
+        try:
+            notes = [SongNote(note_type, NoteDurations.Quarter) for note_type in note_types]
             action = self.robot.play_song(notes)
             action.wait_for_completed(timeout=_DEFAULT_TIMEOUT)
             if action.has_succeeded:
@@ -416,7 +490,7 @@ class CozmoAPI(CozmoAPIBase):
         if self.robot.is_freeplay_mode_active:
             return "Cozmo entered freeplay mode."
         else:
-            return f"Failed."
+            return "Failed."
 
     def cozmo_stops_freeplay(self) -> str:
         """
@@ -429,7 +503,7 @@ class CozmoAPI(CozmoAPIBase):
         if not self.robot.is_freeplay_mode_active:
             return "Cozmo exited freeplay mode."
         else:
-            return f"failed to stop freeplay mode."
+            return "failed to stop freeplay mode."
 
     def cozmo_battery_level(self) -> str:
         """
@@ -494,10 +568,10 @@ class CozmoAPI(CozmoAPIBase):
             self.backpack_light = None
         else:
             try:
-                self.backpack_light = cozmo.lights.Light(cozmo.lights.Color(rgb=(int(R), int(G), int(B))))
+                self.backpack_light = _backpack_light((int(R), int(G), int(B)))
                 self.robot.set_all_backpack_lights(self.backpack_light)
             except AttributeError:
-                return f"Failed."
+                return "Failed."
         return f"Cozmo's backpack lights set to ({R}, {G}, {B})."
 
     def cozmo_sets_headlight(self, on_off: str) -> str:
@@ -510,16 +584,13 @@ class CozmoAPI(CozmoAPIBase):
         Returns:
             A string indicating the result, e.g., "Cozmo's headlight turned on."
         """
-        on_off = on_off.lower()
-        if on_off == "on":
-            self.robot.set_head_light(True)
-            return "Cozmo's headlight turned on."
-        elif on_off == "off":
-            self.robot.set_head_light(False)
-            return "Cozmo's headlight turned off."
-        else:
+        enable = HEADLIGHT_OPTIONS.get(str(on_off).lower())
+        if enable is None:
             return f"Invalid option: {on_off}"
 
+        self.robot.set_head_light(enable)
+        return f"Cozmo's headlight turned {'on' if enable else 'off'}."
+
     def cozmo_sets_volume(self, volume: float) -> str:
         """
         Sets Cozmo's speaker volume.
@@ -541,7 +612,7 @@ class CozmoAPI(CozmoAPIBase):
             A string indicating success or failure. A description of the image will be provided in the system messages.
         """
         self.image = self.get_image_from_camera()
-        if self.image:
+        if self.image is not None:
             return "" # Result will be provide by the generative model after inspecting the image
         else:
             return "Failed."
@@ -550,6 +621,7 @@ class CozmoAPI(CozmoAPIBase):
 
 
 def _cozmo_test_program(robot: cozmo.robot.Robot):
+    import user_voice_input # only needed here, it loads the audio and speech recognition libraries
 
     def print_events(event):
         print(event)
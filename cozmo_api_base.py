@@ -1,42 +1,70 @@
 import cozmo
 from event_messages import event_log, EventType
 import ast
-import traceback
-from datetime import datetime
+import collections
+import functools
+import inspect
+import logging
+import time
+import types
+
+_log = logging.getLogger(__name__)
+
+_MAX_LAST_EVENTS = 1024 # cubes, faces and pets remembered by the event throttle
 
 class CozmoEvents:
 
-    def __init__(self, robot) -> None:
-        self.monitored_events = {
-            cozmo.objects.EvtObjectTapped: lambda kwargs: f"Cube was tapped! object_id: {int(kwargs['obj'].object_id)}, intensity: {kwargs['tap_intensity']}.",
-            cozmo.objects.EvtObjectMoving: lambda kwargs: f"Cube was moved! object_id: {int(kwargs['obj'].object_id)}.",
-            cozmo.objects.EvtObjectObserved: lambda kwargs: f"Cozmo saw a cube! object_id: {int(kwargs['obj'].object_id)}.",
-            cozmo.faces.EvtFaceObserved: lambda kwargs: f"Cozmo saw a person! face_id: {int(kwargs['face'].face_id)}{', name: ' + kwargs['name'] if kwargs['name'] else ''}.",
-            cozmo.pets.EvtPetObserved: lambda kwargs: f"Cozmo saw a pet! pet_id: {int(kwargs['pet'].pet_id)}.",
-        }
+    __slots__ = ('last_events',)
 
-        self.last_events = {}
+    # event type: (message formatter, id of the object/face/pet that triggered it)
+    monitored_events = {
+        cozmo.objects.EvtObjectTapped: (lambda kwargs: f"Cube was tapped! object_id: {int(kwargs['obj'].object_id)}, intensity: {kwargs['tap_intensity']}.",
+                                        lambda kwargs: kwargs['obj'].object_id),
+        cozmo.objects.EvtObjectMoving: (lambda kwargs: f"Cube was moved! object_id: {int(kwargs['obj'].object_id)}.",
+                                        lambda kwargs: kwargs['obj'].object_id),
+        cozmo.objects.EvtObjectObserved: (lambda kwargs: f"Cozmo saw a cube! object_id: {int(kwargs['obj'].object_id)}.",
+                                          lambda kwargs: kwargs['obj'].object_id),
+        cozmo.faces.EvtFaceObserved: (lambda kwargs: f"Cozmo saw a person! face_id: {int(kwargs['face'].face_id)}{', name: ' + kwargs['name'] if kwargs['name'] else ''}.",
+                                      lambda kwargs: kwargs['face'].face_id),
+        cozmo.pets.EvtPetObserved: (lambda kwargs: f"Cozmo saw a pet! pet_id: {int(kwargs['pet'].pet_id)}.",
+                                    lambda kwargs: kwargs['pet'].pet_id),
+    }
+
+    def __init__(self, robot) -> None:
+        self.last_events = collections.OrderedDict() # least recently reported first
 
         for event in self.monitored_events:
             robot.add_event_handler(event, self.event_handler)
 
     def event_handler(self, cozmo_event, **kwargs):
         event_type = type(cozmo_event)
-        event_name = type(cozmo_event).__name__
-        if event_name not in self.last_events:
-            self.last_events[event_name] = datetime.now()
-            event_log.message(EventType.SYSTEM_MESSAGE, self.monitored_events[event_type](kwargs))
-
-        now = datetime.now()
-        delta = (now - self.last_events[event_name]).total_seconds()
-        if delta > 5:
-            event_log.message(EventType.SYSTEM_MESSAGE, self.monitored_events[event_type](kwargs))
-            self.last_events[event_name] = now
-
+        get_message, get_id = self.monitored_events[event_type]
+        # report each event at most once every 5 seconds for the same cube, face or pet
+        key = (event_type, get_id(kwargs))
+        now = time.monotonic()
+        last_events = self.last_events
+        last = last_events.get(key)
+        if last is None or now - last > 5:
+            event_log.message(EventType.SYSTEM_MESSAGE, get_message(kwargs))
+            last_events[key] = now
+            last_events.move_to_end(key)
+            if len(last_events) > _MAX_LAST_EVENTS:
+                last_events.popitem(last=False)
 
 class CozmoAPIBase:
     """Base class for the API interface to Cozmo."""
 
+    __slots__ = ('robot', 'voice_input', 'cozmo_events', 'image', 'backpack_light', '__weakref__')
+
+    # Setters that leave Cozmo in the same state when repeated with the same arguments. Motions such as cozmo_head are
+    # left out, a repeated motion is usually the model retrying it.
+    _IDEMPOTENT_COMMANDS = frozenset({'cozmo_sets_volume', 'cozmo_sets_headlight', 'cozmo_sets_backpack_lights'})
+
+    @staticmethod
+    def _is_failure(result) -> bool:
+        """Tells if an API result reports a failure, e.g. "Failed." or "Cozmo failed to set volume."."""
+        return 'fail' in result.lower() or result.startswith('Invalid')
+
     def __init__(self, robot: cozmo.robot.Robot, voice_input):
         self.robot = robot
         self.voice_input = voice_input
@@ -45,6 +73,16 @@ class CozmoAPIBase:
         self.image = None
         self.backpack_light = None
 
+    def close(self):
+        """Stops receiving events from the event log, so that the API object can be released."""
+        event_log.remove_callback(self._event_calback)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _event_calback(self, event):
         event_type, event_message = event
         if event_type == EventType.VOICE_EVENT_LISTENING:
@@ -76,7 +114,55 @@ class CozmoAPIBase:
         """
         
         self.image = None
-        results = []
+        results = "\n".join(self._execute_commands_iter(command_string))
+        return results, self.image
+
+    def _execute_commands_iter(self, command_string: str):
+        """
+        Executes the commands in command_string in order, yielding the result message of each of them as soon as it is available.
+        """
+        last_call, last_result = None, None
+        for line, function, args in self._compile_commands(command_string):
+            if function is None:
+                # args holds the reason why the line can't be executed
+                message = f"Result of {line}: {args}"
+                event_log.message(EventType.API_RESULT, message)
+                yield message
+                continue
+
+            try:
+                # Call the function and store the result, unless it just ran with the same arguments
+                call = (function, args)
+                if call == last_call and function.__name__ in self._IDEMPOTENT_COMMANDS:
+                    result = last_result
+                else:
+                    last_call = None
+                    result = function(self, *args)
+                    if not self._is_failure(result): # failures are tried again when the line repeats
+                        last_call, last_result = call, result
+            except Exception as e:
+                # a failing call can be a bug in the API or in the robot connection, so its traceback is kept
+                _log.warning("API call failed: %s", line, exc_info=True)
+                message = f"Result of {line}: API Call Error: {type(e).__name__} {e}."
+                event_log.message(EventType.API_RESULT, message)
+                yield message
+                continue
+
+            if result:
+                message = f"Result of {line}: {result}"
+                event_log.message(EventType.API_RESULT, message)
+                yield message
+
+    def _compile_commands(self, command_string: str) -> list:
+        """
+        Parses all commands before any of them is executed, so that running them is just a sequence of function calls.
+
+        Returns:
+            A list of (line, function, arguments) tuples, one for each non-empty line. When a line can't be executed,
+            function is None and arguments is the error message.
+        """
+        commands = self.api_commands()
+        plan = []
         for line in command_string.splitlines():
             line = line.strip()  # Remove leading/trailing whitespace
             if line:  # Ignore empty lines
@@ -84,45 +170,35 @@ class CozmoAPIBase:
                     # Split command into function name and arguments, handling commas within strings
                     function_name, args = _parse_api_call(line)
 
-                    # Get the corresponding function from CozmoAPI
-                    function = getattr(self, function_name)
-
-                    # Check if the function exists
-                    if not hasattr(self, function_name):
-                        message = f"Result of {line}: Error: Function '{function_name}' does not exist."
-                        event_log.message(EventType.API_RESULT, message)
-                        results.append(message)
+                    # Get the corresponding cozmo_* function from the API class
+                    function = commands.get(function_name)
+                    if function is None:
+                        plan.append((line, None, f"Error: Function '{function_name}' does not exist."))
                         continue
 
-                    # Check if the function is callable
-                    if not callable(function):
-                        message = f"Result of {line}: Error: '{function_name}' is not callable."
-                        event_log.message(EventType.API_RESULT, message)
-                        results.append(message)
-                        continue
-
-                    # Convert arguments to appropriate types (if needed)
-                    converted_args = []
-                    for arg in args:
-                        try:
-                            converted_args.append(float(arg))  # Try converting to float
-                        except ValueError:
-                            converted_args.append(arg)  # Keep as string
-
-                    # Call the function and store the result
-                    result = function(*converted_args)
-                    if result:
-                        message = f"Result of {line}: {result}"
-                        event_log.message(EventType.API_RESULT, message)
-                        results.append(message)
+                    # Convert numbers to the types the function expects, other arguments are passed as they are
+                    converters = _argument_converters(function)
+                    converted_args = [convert(arg) for convert, arg in zip(converters, args)]
+                    converted_args.extend(args[len(converters):]) # extra arguments fail when the function is called
+                    plan.append((line, function, converted_args))
                 except Exception as e:
-                    traceback.print_exc()
-                    message = f"Result of {line}: API Call Error: {type(e).__name__} {e}."
-                    event_log.message(EventType.API_RESULT, message)
-                    results.append(message)
+                    # malformed calls from the model are expected, the message below is enough for it
+                    _log.debug("Invalid API call: %s", line, exc_info=True)
+                    plan.append((line, None, f"API Call Error: {type(e).__name__} {e}."))
+
+        return plan
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def api_commands(cls) -> dict:
+        """Returns the cozmo_* functions of this API class by name, in definition order. Computed once per class."""
+        commands = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if name.startswith('cozmo_') and callable(attr):
+                    commands[name] = attr
+        return commands
 
-        return "\n".join(results), self.image
-    
     def get_image_from_camera(self):
         self.robot.camera.color_image_enabled = True
         self.robot.camera.image_stream_enabled = True
@@ -130,38 +206,60 @@ class CozmoAPIBase:
     
 ### End of CozmoAPIBase class
 
+@functools.lru_cache(maxsize=512)
 def _parse_api_call(api_call: str):
-    parsed = ast.parse(api_call)
-
-    function_name = parsed.body[0].value.func.id
-
-    arguments = []
-    for arg in parsed.body[0].value.args:
-        if isinstance(arg, ast.Tuple) or isinstance(arg, ast.List):
-            # If the argument is a tuple or list, extract its values
-            arg_values = []
-            for elem in arg.elts:
-                if isinstance(elem, ast.UnaryOp):
-                    # Handle unary operations within tuples
-                    if isinstance(elem.op, ast.USub):  # Check if it's a unary subtraction
-                        arg_values.append(-elem.operand.value)  # Negate the value
-                    else:
-                        raise ValueError("Unsupported unary operation")
-                else:
-                    arg_values.append(elem.value)
-            arguments.append(arg_values)
-        elif isinstance(arg, ast.UnaryOp):
-            # If the argument is a unary operation, extract its value
-            if isinstance(arg.op, ast.USub):  # Check if it's a unary subtraction
-                arg_value = -arg.operand.value  # Negate the value
-            else:
-                raise ValueError("Unsupported unary operation")
-            arguments.append(arg_value)
-        else:
-            # If the argument is not a tuple or unary operation, extract its value directly
-            if arg.value is not None:
-                arguments.append(arg.value)
-            else:
-                print(f'invalid arg: {arg}.')
+    # The model tends to repeat the same calls, so parsed lines are cached. Arguments are returned as a tuple
+    # because the same result is handed to every caller.
+    if api_call.endswith('()') and api_call[:-2].isidentifier():
+        # calls without arguments, e.g. cozmo_sees(), don't need the parser
+        return api_call[:-2], ()
+
+    call = ast.parse(api_call, mode="eval").body
+
+    function_name = call.func.id
+
+    # literal_eval handles strings, numbers (negative ones included), lists and tuples
+    arguments = tuple(_freeze(ast.literal_eval(arg)) for arg in call.args)
+
+    return function_name, arguments
+
+
+def _freeze(value):
+    # Cached arguments are shared by every call of the same line, so list, set and dict literals are made immutable
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return types.MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _default_converter(arg):
+    # Numbers are passed as floats, anything else as it is
+    return float(arg) if type(arg) is int else arg
+
+def _int_converter(arg):
+    # Whole numbers are passed as ints, other numbers are rejected instead of being truncated
+    if type(arg) is float:
+        if not arg.is_integer():
+            raise ValueError(f"{arg} is not an integer")
+        return int(arg)
+    return arg
+
+def _str_converter(arg):
+    # Numbers are passed as their text, e.g. cozmo_sets_headlight(1) gets "1"
+    return str(arg) if type(arg) in (int, float) else arg
+
+# Annotated parameters only have numbers converted, anything else is passed as it is
+_ANNOTATION_CONVERTERS = {int: _int_converter, float: _default_converter, str: _str_converter}
 
-    return function_name, arguments
\ No newline at end of file
+@functools.lru_cache(maxsize=None)
+def _argument_converters(function) -> tuple:
+    """Returns a converter for each positional argument of an API function, chosen from its type annotations."""
+    converters = []
+    for parameter in list(inspect.signature(function).parameters.values())[1:]: # skip self
+        if parameter.kind not in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            break
+        converters.append(_ANNOTATION_CONVERTERS.get(parameter.annotation, _default_converter))
+    return tuple(converters)
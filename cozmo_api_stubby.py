@@ -1,7 +1,6 @@
 import cozmo_api
 import cozmo
 from event_messages import event_log, EventType
-import user_voice_input
 import time
 
 class CozmoAPIStubby(cozmo_api.CozmoAPI):
@@ -12,6 +11,14 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
     parameter in the init method.
     """
 
+    __slots__ = ('succeed',)
+
+    # Messages printed for the voice events, all other events are ignored
+    _VOICE_EVENT_MESSAGES = {
+        EventType.VOICE_EVENT_LISTENING: "Cozmo is listening...",
+        EventType.VOICE_EVENT_FINISHED: "Cozmo has finished listening.",
+    }
+
     def __init__(self, robot: cozmo.robot.Robot=None, voice_input=None, succeed=True):
         self.succeed = succeed  # Flag to simulate success/failure
         self.robot = robot
@@ -20,11 +27,9 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
         self.image = None
 
     def _event_calback(self, event):
-        event_type, event_message = event
-        if event_type == EventType.VOICE_EVENT_LISTENING:
-            print("Cozmo is listening...")
-        elif event_type == EventType.VOICE_EVENT_FINISHED:
-            print("Cozmo has finished listening.")
+        message = self._VOICE_EVENT_MESSAGES.get(event[0])
+        if message:
+            print(message)
 
         return False
 
@@ -58,7 +63,7 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
             A string indicating the result.
         """
         if self.succeed:
-            return f"succeeded."
+            return "succeeded."
         else:
             return "failed."
 
@@ -139,32 +144,16 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
             return "Cozmo failed to move head."
 
     def cozmo_plays_animation(self, animation_name: str) -> str:
-        """
-        Makes Cozmo play a specific animation.
+        if animation_name not in cozmo_api.ANIMATION_NAMES:
+            return f"Animation '{animation_name}' not found."
 
-        Args:
-            animation_name: The name of the animation to play. Supported animation names:
-                Happy/Excited: anim_pyramid_reacttocube_happy_high_02, anim_energy_successgetout_02, anim_explorer_driving01_turbo_01, anim_memorymatch_solo_successgame_player_01, anim_fistbump_success_02, anim_majorwin, anim_keepaway_wingame_03, anim_meetcozmo_celebration, anim_pounce_success_04, anim_speedtap_wingame_intensity03_01
-                
-                Sad/Frustrated: anim_pyramid_reacttocube_frustrated_low_01, anim_memorymatch_solo_failhand_player_01, anim_reacttocliff_turtlerollfail_03, anim_driving_upset_loop_01, anim_speedtap_losehand_02, anim_memorymatch_failgame_cozmo_03, anim_reacttoblock_frustrated_int2_01, anim_rollblock_fail_01, anim_reacttocliff_stuckrightside_01, anim_majorfail, anim_speedtap_losegame_intensity02_02
-                
-                Angry/Scared: anim_guarddog_getout_timeout_01, anim_cozmosays_badword_01, anim_repair_severe_idle_03, anim_reacttoblock_triestoreach_01, anim_repair_react_fall_01, anim_sparking_fail_01, anim_reacttoface_unidentified_01, anim_pounce_fail_04, anim_repair_severe_driving_loop_01
-                
-                Calm/Neutral: anim_explorer_idle_03, anim_lookinplaceforfaces_keepalive_long, anim_sparking_idle_03, anim_hiking_driving_loop_01, anim_launch_idle_03, anim_play_idle_03, anim_memorymatch_idle_02, anim_explorer_drvback_start_02, anim_pause_idle_03, anim_rtpkeepaway_idle_01, anim_energy_idlel2_01, anim_speedtap_player_idle_01, anim_gamesetup_idle_02, anim_neutral_eyes_01
-                
-                Playful/Curious: anim_pounce_drive_01, anim_fistbump_idle_03, anim_keepaway_getready_02, anim_petdetection_cat_01, anim_explorer_getout_01, anim_peekaboo_idle_01, anim_speedtap_ask2play_01, anim_rtpkeepaway_askforgame_01, anim_pounce_lookloop_02, anim_energy_eat_04, anim_play_driving_start_01, anim_petdetection_dog_02, anim_pounce_long_01, anim_speedtap_look4block_01, anim_hiking_lookaround_01, anim_pounce_04, anim_explorer_huh_01, anim_pounce_reacttoobj_01_shorter
-                
-                Sleepy/Tired: anim_launch_startsleeping_01, anim_guarddog_sleeploop_01, anim_gotosleep_sleeping_01, anim_gotosleep_off_01, anim_gotosleep_sleeploop_01
-                
-                Confused/Surprised: anim_reacttocliff_huh_01, anim_dizzy_reaction_medium_03, anim_hiccup_withreaction_01, anim_reacttppl_surprise, anim_explorer_huh_01_head_angle_-10, anim_dizzy_reaction_soft_02, anim_hiccup_faceplant_01, anim_keepalive_eyes_01_updown
-
-        Returns:
-            A string indicating the result, e.g., "Cozmo played animation: [animation_name]"
-        """
         if self.succeed:
             return f"Cozmo played animation: {animation_name}"
         else:
-            return f"failed"
+            return "failed"
+
+    # the list of animations is long, so the stub shares it with CozmoAPI instead of keeping its own copy
+    cozmo_plays_animation.__doc__ = cozmo_api.CozmoAPI.cozmo_plays_animation.__doc__
 
     def cozmo_plays_song(self, song_notes: str) -> str:
         """
@@ -179,6 +168,11 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
         Returns:
             A string indicating the result, e.g., "Cozmo played the song."
         """
+        try:
+            cozmo_api.parse_song_notes(song_notes)
+        except ValueError as e:
+            return str(e)
+
         if self.succeed:
             return "Cozmo played the song."
         else:
@@ -383,27 +377,25 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
         if self.succeed:
             return f"Cozmo's backpack lights set to ({R}, {G}, {B})."
         else:
-            return f"Failed."
+            return "Failed."
         
-    def cozmo_sets_headlight(self, state: bool) -> str:
+    def cozmo_sets_headlight(self, on_off: str) -> str:
         """
-        Simulates setting the Cozmo's headlight (success or failure based on init flag).
+        Simulates setting the Cozmo's headlight.
 
         Args:
-            state: True to turn the headlight on, False to turn it off.
+            on_off: string "on" to turn the headlight on, "off" to turn it off.
 
         Returns:
             A string indicating the result, e.g., "Cozmo's headlight turned on."
         """
-        on_off = on_off.lower()
-        if on_off == "on":
-            return "Cozmo's headlight turned on."
-        elif on_off == "off":
-            return "Cozmo's headlight turned off."
-        else:
+        enable = cozmo_api.HEADLIGHT_OPTIONS.get(str(on_off).lower())
+        if enable is None:
             return f"Invalid option: {on_off}"
 
-    def cozmo_sets_volume(self, volume: int) -> str:
+        return f"Cozmo's headlight turned {'on' if enable else 'off'}."
+
+    def cozmo_sets_volume(self, volume: float) -> str:
         """
         Simulates setting the Cozmo's volume (success or failure based on init flag).
 
@@ -431,6 +423,8 @@ class CozmoAPIStubby(cozmo_api.CozmoAPI):
             return "Failed."
 
 if __name__ == "__main__":
+    import user_voice_input # only needed here, it loads the audio and speech recognition libraries
+
     def print_events(event):
         print(event)
 
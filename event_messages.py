@@ -1,4 +1,7 @@
 from enum import Enum
+import collections
+import inspect
+import weakref
 
 class EventType(Enum):
 
@@ -11,26 +14,46 @@ class EventType(Enum):
 
 class EventMessages:
     
-    def __init__(self) -> None:
-        self.event_list = []
-        self.event_callbacks = []
+    def __init__(self, max_events=10_000) -> None:
+        # events not popped in time are dropped, oldest first, once there are max_events of them
+        self.event_list = collections.deque(maxlen=max_events)
+        # replaced by a new tuple whenever a callback is added or removed, so that dispatching events never sees a
+        # partially updated collection, even if a callback is removed while an event is being dispatched
+        self.event_callbacks = ()
 
     def add_callback(self, callback_function):
-        self.event_callbacks.append(callback_function)
+        # callbacks are stored as references that return the function when called. Bound methods are referenced
+        # weakly, so that registering an object's method doesn't keep the object alive after it is discarded
+        if inspect.ismethod(callback_function):
+            callback_ref = weakref.WeakMethod(callback_function, self._remove_callback_ref)
+        else:
+            callback_ref = lambda: callback_function
+        self.event_callbacks += (callback_ref,)
+
+    def remove_callback(self, callback_function):
+        for callback_ref in self.event_callbacks:
+            if callback_ref() == callback_function:
+                self._remove_callback_ref(callback_ref)
+                break
+
+    def _remove_callback_ref(self, callback_ref):
+        # also called when the object of a weakly referenced method is garbage collected
+        self.event_callbacks = tuple(ref for ref in self.event_callbacks if ref is not callback_ref)
 
     def message(self, event_type:EventType, event_message:str):
-        self.event_list.append((event_type, event_message))
-        for fn in self.event_callbacks:
-            fn((event_type, event_message))
+        event = (event_type, event_message)
+        self.event_list.append(event)
+        for callback_ref in self.event_callbacks:
+            fn = callback_ref()
+            if fn is not None:
+                fn(event)
 
     def pop_all_events(self):
         # n is current list size
         n = len(self.event_list)
-        # get first n elements
-        pop = self.event_list[:n] 
-        # remove first n elements and leave the rest (in case new elements where added)
-        self.event_list = self.event_list[n:]
+        # remove the first n elements one by one and leave the rest (in case new elements where added)
+        popleft = self.event_list.popleft
         # return removed elements
-        return pop
+        return [popleft() for _ in range(n)]
 
 event_log = EventMessages()
\ No newline at end of file
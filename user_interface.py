@@ -17,6 +17,7 @@ class UserInterface():
 
     def __init__(self, get_image=None):
         self.new_user_input_provided = False
+        self.new_user_input_condition = threading.Condition() # notified when new_user_input_provided is set
         self.user_says = ''
         self.history = ''
         self.get_image = get_image
@@ -68,7 +69,9 @@ class UserInterface():
             self.user_says = request.form['user_says']
             if self.user_says:
                 event_log.message(EventType.USER_MESSAGE, self.user_says)                
-                self.new_user_input_provided = True
+                with self.new_user_input_condition:
+                    self.new_user_input_provided = True
+                    self.new_user_input_condition.notify_all()
 
         return render_template_string(self.input_page, user_says='', history=self.history)
 
@@ -79,9 +82,9 @@ class UserInterface():
         self.history += messages
 
     def capture_user_input(self):
-        self.new_user_input_provided = False
-        while not self.new_user_input_provided:
-            sleep(0.05)
+        with self.new_user_input_condition:
+            self.new_user_input_provided = False
+            self.new_user_input_condition.wait_for(lambda: self.new_user_input_provided)
         return self.user_says
 
     def handle_cozmoImage(self):
@@ -89,7 +92,7 @@ class UserInterface():
         if self.get_image:
             try:
                 image = self.get_image()
-                if image:
+                if image is not None:
                     image = image.annotate_image(scale=2)
                     img_io = BytesIO()
                     image.save(img_io, 'PNG')
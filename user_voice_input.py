@@ -1,11 +1,26 @@
 import pvporcupine
 from google.cloud import speech, texttospeech
+from google.api_core.exceptions import GoogleAPIError
+from google.auth.exceptions import GoogleAuthError
 import pyaudio
 import struct
+import functools
 import os
 from event_messages import event_log, EventType
 import threading
-import time
+import traceback
+
+# The recognition settings never change, so they are built once
+_STREAMING_CONFIG = speech.StreamingRecognitionConfig(
+    config=speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=16000,
+        language_code="en-US",
+        # language_code="pt-BR",
+    ),
+    # single_utterance makes the service tell when the user stops talking, so recording can stop before RECORD_TIME
+    single_utterance=True,
+)
 
 class VoiceInput:
 
@@ -22,9 +37,6 @@ class VoiceInput:
         # Creating a Porcupine instance
         self.porcupine = pvporcupine.create(access_key=self.access_key, keyword_paths=[self.keyword_path])
 
-        # Initializing Google Cloud Speech-to-Text client
-        self.speech_client = speech.SpeechClient()
-
         # Initializing PyAudio
         self.pa = pyaudio.PyAudio()
         self.audio_stream = self.pa.open(
@@ -35,46 +47,70 @@ class VoiceInput:
             frames_per_buffer=self.porcupine.frame_length
         )
 
+        self._listening_finished = threading.Event() # set while Cozmo is not listening
         self.trigger_listen = False
         self.user_input = ''
 
+    # The Google Cloud clients are only created when first used
+
+    @functools.cached_property
+    def speech_client(self):
+        # Initializing Google Cloud Speech-to-Text client
+        return speech.SpeechClient()
+
+    @functools.cached_property
+    def tts_client(self):
         # Initializing Google Cloud TTS API client
-        self.tts_client = texttospeech.TextToSpeechClient()
+        return texttospeech.TextToSpeechClient()
 
-    def _record_audio(self, stream, rate, frame_length, record_seconds):
-        event_log.message(EventType.VOICE_EVENT_LISTENING, "Listening...")
-        frames = []
+    def _record_audio_requests(self, stream, rate, frame_length, record_seconds, end_of_utterance):
+        """Yields the audio read from stream as streaming recognition requests, until the user stops talking."""
         for _ in range(0, int(rate / frame_length * record_seconds)):
+            if end_of_utterance.is_set():
+                break
             try:
                 data = stream.read(frame_length, exception_on_overflow=False) 
-                frames.append(data)
+                yield speech.StreamingRecognizeRequest(audio_content=data)
             except IOError as e:
                 if e.errno == pyaudio.paInputOverflowed:
                     # Handling overflow
                     continue  # Proceed to the next frame
-        event_log.message(EventType.VOICE_EVENT_FINISHED, "Stopped listening")
-        return b''.join(frames)
-
-    def _transcribe_audio(self, client, audio_data):
-        """Function to convert speech to text using Google Speech-to-Text."""
-        audio = speech.RecognitionAudio(content=audio_data)
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=16000,
-            language_code="en-US",
-            # language_code="pt-BR",
-        )
-        response = client.recognize(config=config, audio=audio)
 
-        # Return text only if there are results
-        if response.results:
-            return response.results[0].alternatives[0].transcript
+    def _transcribe_audio_stream(self, client, stream, rate, frame_length, record_seconds):
+        """Function to convert speech to text using Google Speech-to-Text, while it is recorded."""
+        end_of_utterance = threading.Event()
+        requests = self._record_audio_requests(stream, rate, frame_length, record_seconds, end_of_utterance)
+
+        event_log.message(EventType.VOICE_EVENT_LISTENING, "Listening...")
+        transcript = ''
+        try:
+            for response in client.streaming_recognize(config=_STREAMING_CONFIG, requests=requests):
+                if response.speech_event_type == speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE:
+                    end_of_utterance.set()
+                # Return text only if there are results
+                for result in response.results:
+                    if result.is_final and result.alternatives:
+                        transcript += result.alternatives[0].transcript
+        finally:
+            end_of_utterance.set()
+            event_log.message(EventType.VOICE_EVENT_FINISHED, "Stopped listening")
+
+        return transcript
+
+    @property
+    def trigger_listen(self):
+        return not self._listening_finished.is_set()
+
+    @trigger_listen.setter
+    def trigger_listen(self, listen):
+        if listen:
+            self._listening_finished.clear()
         else:
-            return ''
+            self._listening_finished.set()
 
     def wait_listening_finish(self):
-        while self.trigger_listen:
-                time.sleep(0.1)
+        # blocks without polling until the listening thread is done
+        self._listening_finished.wait()
 
     def capture_user_input(self, block=False):
         self.trigger_listen = True
@@ -86,9 +122,14 @@ class VoiceInput:
 
     def _listen(self):
 
-        # Recording voice input and converting it to text
-        audio_data = self._record_audio(self.audio_stream, self.porcupine.sample_rate, self.porcupine.frame_length, VoiceInput.RECORD_TIME)
-        user_input = self._transcribe_audio(self.speech_client, audio_data)
+        # Recording voice input and converting it to text as it is recorded
+        try:
+            user_input = self._transcribe_audio_stream(self.speech_client, self.audio_stream, self.porcupine.sample_rate, self.porcupine.frame_length, VoiceInput.RECORD_TIME)
+        except (GoogleAuthError, GoogleAPIError):
+            # the speech client is created on first use: on missing credentials or service errors keep the keyword
+            # loop running, so that trigger_listen is still cleared and the next request can be heard
+            traceback.print_exc()
+            user_input = ''
 
         return user_input
 
@@ -96,10 +137,12 @@ class VoiceInput:
         threading.Thread(target=self.wait_keyword_loop, daemon=True).start()
 
     def wait_keyword_loop(self):
+        # every frame has the same size, so the format is compiled once for the whole loop
+        unpack_pcm = struct.Struct(f"{self.porcupine.frame_length}h").unpack_from
         while True:
             # Reading audio data from PyAudio stream
             pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-            pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+            pcm = unpack_pcm(pcm)
 
             # Detecting wake word using Porcupine
             keyword_index = self.porcupine.process(pcm)